@@ -7,9 +7,16 @@ validate an ontology graph against the default Brick Schema constraints (called
 import sys
 import argparse
 from rdflib import Graph
+from rdflib.util import guess_format
 from brickschema.validate import Validator
 
 
+def parseFormat(filename):
+    # N-Triples is much faster to parse than Turtle, so don't assume Turtle
+    # for files that say otherwise
+    return guess_format(filename) or "turtle"
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="pySHACL wrapper for reporting constraint violating triples."
@@ -18,7 +25,7 @@ def main():
         "data",
         metavar="DataGraph",
         type=argparse.FileType("rb"),
-        help="Data graph file.",
+        help="Data graph file (format guessed from extension, default Turtle).",
     )
     parser.add_argument(
         "-s",
@@ -59,6 +66,16 @@ def main():
         choices=("none", "rdfs", "owlrl", "both"),
         help="Type of inference against data graph before validating.",
     )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        dest="backend",
+        action="store",
+        default=None,
+        choices=("pyshacl", "topbraid"),
+        help="SHACL engine (default: $BRICK_SHACL_BACKEND or pyshacl). "
+        "topbraid requires shaclvalidate.sh from TopQuadrant SHACL on PATH.",
+    )
     parser.add_argument(
         "-m",
         "--metashacl",
@@ -95,25 +112,26 @@ def main():
     args = parser.parse_args()
 
     dataG = Graph()
-    dataG = dataG.parse(args.data, format="turtle")
+    dataG = dataG.parse(args.data, format=parseFormat(args.data.name))
 
     shaclGraphs = []
     if args.shacl:
         for shaclFile in args.shacl:
             shaclG = Graph()
-            shaclG.parse(shaclFile, format="turtle")
+            shaclG.parse(shaclFile, format=parseFormat(shaclFile))
             shaclGraphs.append(shaclG)
 
     ontGraphs = []
     if args.ont:
         for ontFile in args.ont:
             ontG = Graph()
-            ontG.parse(ontFile, format="turtle")
+            ontG.parse(ontFile, format=parseFormat(ontFile))
             ontGraphs.append(ontG)
 
     v = Validator(
         useBrickSchema=(False if args.noBrickSchema else True),
         useDefaultShapes=(False if args.noDefaultShapes else True),
+        backend=args.backend,
     )
     result = v.validate(
         dataG,
@@ -1,18 +1,231 @@
 """
 The `validate` module implements a wrapper of `pySHACL`_ to
 validate an ontology graph against the default Brick Schema constraints (called *shapes*) and user-defined shapes.
+The validation can also be run by `TopQuadrant SHACL`_ instead of pySHACL.
 
 .. _`pySHACL`: https://github.com/RDFLib/pySHACL
+.. _`TopQuadrant SHACL`: https://github.com/TopQuadrant/shacl
 """
 import os
 import logging
+import hashlib
+import pickle
+import shutil
+import subprocess
+import tempfile
+import weakref
+import owlrl
 from rdflib import Graph, Namespace, URIRef, BNode, Literal
-from rdflib.plugins.sparql import prepareQuery
+from rdflib.namespace import split_uri
 from .namespaces import A, RDF, RDFS, BRICK, BSH, SH, SKOS
 import pyshacl
+from pyshacl.inference import CustomRDFSSemantics, CustomRDFSOWLRLSemantics
 import io
 import pkgutil
 
+# Parsed copies of the packaged ontologies are pickled here so that only
+# the first Validator pays for rdflib's Turtle parser.  Can be redirected
+# with the BRICK_CACHE_DIR environment variable.
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "brickschema")
+
+# Terms used for every violation, built once instead of by Namespace
+# lookups (which create a new URIRef each time) in the loops.
+_SH_RESULT = SH.result
+_SH_RESULT_PATH = SH.resultPath
+_SH_FOCUS_NODE = SH.focusNode
+_SH_VALUE = SH.value
+_SH_SOURCE_SHAPE = SH.sourceShape
+_SH_SOURCE_CONSTRAINT_COMPONENT = SH.sourceConstraintComponent
+_OFFENDING_TRIPLE = BSH["offendingTriple"]
+_OFFENDER_HINT = BSH["offenderHint"]
+_RDFS_DOMAIN = RDFS.domain
+_RDFS_RANGE = RDFS.range
+
+
+def _load_cached_graph(resource, cache_dir=None):
+    """
+    Loads a Turtle file packaged with brickschema into a new graph.  The
+    parsed namespaces and triples are pickled into cache_dir (keyed by the
+    file's content hash) and loaded from there on later calls.
+
+    Args:
+        resource (str): path of the Turtle file relative to this package
+        cache_dir (str): directory holding the pickles; defaults to
+            $BRICK_CACHE_DIR, else CACHE_DIR
+
+    Returns:
+        A rdflib.Graph with the triples and namespaces of the resource
+    """
+    log = logging.getLogger("validate")
+    data = pkgutil.get_data(__name__, resource)
+    digest = hashlib.sha256(data).hexdigest()
+    cache_dir = cache_dir or os.environ.get("BRICK_CACHE_DIR") or CACHE_DIR
+    cache_path = os.path.join(
+        cache_dir, f"{os.path.basename(resource)}.{digest}.pickle"
+    )
+
+    g = Graph()
+    try:
+        with open(cache_path, "rb") as f:
+            namespaces, triples = pickle.load(f)
+    except Exception as e:
+        # missing, unreadable or damaged cache: parse the Turtle again
+        if not isinstance(e, FileNotFoundError):
+            log.warning(f"ignoring cached {resource} in {cache_path}: {e}")
+        g.parse(source=io.StringIO(data.decode()), format="turtle")
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}"
+            with open(tmp_path, "wb") as f:
+                pickle.dump((list(g.namespaces()), list(g)), f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            log.warning(f"could not cache {resource} in {cache_path}: {e}")
+        return g
+
+    for (prefix, path) in namespaces:
+        g.bind(prefix, path)
+    g.addN((s, p, o, g) for (s, p, o) in triples)
+    return g
+
+
+def _merge_graphs(graphs):
+    """
+    Merges graphs and their namespace bindings into a new graph.  Unlike
+    chaining Graph + Graph, the partial result is not copied per graph.
+    """
+    merged = Graph()
+    for g in graphs:
+        for (prefix, path) in g.namespaces():
+            merged.bind(prefix, path)
+        merged += g
+    return merged
+
+
+class PySHACLBackend:
+    """
+    Runs SHACL validation with pySHACL
+    """
+
+    # validate(meta_shacl=True) really checks the shapes against shacl-shacl
+    supports_meta_shacl = True
+
+    def validate(
+        self,
+        data_graph,
+        shacl_graph,
+        ont_graph,
+        inference="rdfs",
+        abort_on_error=False,
+        meta_shacl=True,
+        debug=False,
+    ):
+        """
+        Validates data_graph against shacl_graph, mixing in ont_graph
+
+        Returns:
+            (conforms, results_graph, results_text) as from pyshacl.validate()
+        """
+        return pyshacl.validate(
+            data_graph,
+            shacl_graph=shacl_graph,
+            ont_graph=ont_graph,
+            inference=inference,
+            abort_on_error=abort_on_error,
+            meta_shacl=meta_shacl,
+            debug=debug,
+        )
+
+
+class TopBraidBackend:
+    """
+    Runs SHACL validation with the command line tool of TopQuadrant's SHACL
+    API (https://github.com/TopQuadrant/shacl), which requires Java
+    """
+
+    # the tool has no shacl-shacl check; meta_shacl is ignored
+    supports_meta_shacl = False
+
+    # pyshacl's inference choices and the semantics pyshacl runs for them.
+    # Its custom RDFS classes skip owlrl's one-time rules, which copy triples
+    # between all literals of equal Python value (1 == 1.0 == True).
+    semantics = {
+        "rdfs": CustomRDFSSemantics,
+        "owlrl": owlrl.OWLRL_Semantics,
+        "both": CustomRDFSOWLRLSemantics,
+    }
+
+    def __init__(self, command="shaclvalidate.sh"):
+        """
+        Creates a new TopQuadrant SHACL backend
+
+        Args:
+            command (str): name or path of the shaclvalidate script
+        """
+        self.command = shutil.which(command)
+        if self.command is None:
+            raise FileNotFoundError(
+                f"'{command}' not found. Install TopQuadrant SHACL from \
+https://github.com/TopQuadrant/shacl and add its bin directory to PATH"
+            )
+
+    def validate(
+        self,
+        data_graph,
+        shacl_graph,
+        ont_graph,
+        inference="rdfs",
+        abort_on_error=False,
+        meta_shacl=False,
+        debug=False,
+    ):
+        """
+        Validates data_graph against shacl_graph, mixing in ont_graph.
+        abort_on_error, meta_shacl and debug are not supported by the tool
+        and are ignored.
+
+        Returns:
+            (conforms, results_graph, results_text) like pyshacl.validate(),
+            except that results_text is only the report header without the
+            text for each result
+        """
+        # The tool neither takes an ontology graph nor does inference, so
+        # mix the ontology into the data and expand it here like pySHACL.
+        dataG = Graph()
+        dataG += data_graph
+        dataG += ont_graph
+        if inference in self.semantics:
+            owlrl.DeductiveClosure(self.semantics[inference]).expand(dataG)
+            # owlrl still types literals ("1" a rdfs:Literal), which N-Triples
+            # cannot express, and pySHACL's validation never reaches them
+            for triple in [t for t in dataG if isinstance(t[0], Literal)]:
+                dataG.remove(triple)
+
+        # N-Triples is the fastest format for rdflib to write
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_file = os.path.join(tmpdir, "data.nt")
+            shapes_file = os.path.join(tmpdir, "shapes.nt")
+            dataG.serialize(destination=data_file, format="nt")
+            shacl_graph.serialize(destination=shapes_file, format="nt")
+            proc = subprocess.run(
+                [self.command, "-datafile", data_file, "-shapesfile", shapes_file],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        if proc.returncode != 0:
+            raise Exception(
+                f"{self.command} failed ({proc.returncode}): {proc.stderr.decode()}"
+            )
+
+        results_graph = Graph()
+        results_graph.parse(data=proc.stdout.decode(), format="turtle")
+        conforms = next(results_graph.objects(None, SH.conforms)).toPython()
+        results = list(results_graph.objects(None, _SH_RESULT))
+        results_text = (
+            f"Validation Report\nConforms: {conforms}\nResults ({len(results)}):\n"
+        )
+        return (conforms, results_graph, results_text)
+
 
 class Validator:
     """
@@ -20,48 +233,85 @@ class Validator:
     constraints specific to the user's ontology.
     """
 
+    backends = {"pyshacl": PySHACLBackend, "topbraid": TopBraidBackend}
+
+    # Brick.ttl and BrickShape.ttl as loaded by __init__, shared by all live
+    # Validators and keyed by the file's sha256.  They must not be modified
+    # once loaded; validate() hands merged copies to the backend.
+    _ontologyCache = weakref.WeakValueDictionary()
+
+    # hashes of the triples (blank node labels included) of the combined
+    # shape graphs already checked against shacl-shacl
+    _metaValidatedShapes = set()
+
     # build accumulative namespace index from participating files
     # build list of violations, each is a graph
-    def __init__(self, useBrickSchema=True, useDefaultShapes=True):
+    def __init__(self, useBrickSchema=True, useDefaultShapes=True, backend=None):
+        """
+        Args:
+            useBrickSchema: if True, uses Brick.ttl as an ontology graph
+            useDefaultShapes: if True, uses BrickShape.ttl as a shape graph
+            backend: SHACL engine, either 'pyshacl' or 'topbraid', or an object
+                with the same validate() method and supports_meta_shacl
+                attribute as PySHACLBackend.  Defaults to the
+                BRICK_SHACL_BACKEND environment variable, else 'pyshacl'.
+        """
         # see __init__.py for logging.basicConfig settings
         self.log = logging.getLogger("validate")
         self.log.setLevel(
             logging.DEBUG if "PYTEST_CURRENT_TEST" in os.environ else logging.WARNING
         )
 
+        if backend is None:
+            backend = os.environ.get("BRICK_SHACL_BACKEND", "pyshacl")
+        if isinstance(backend, str):
+            if backend not in self.backends:
+                raise Exception(f"Invalid backend '{backend}'")
+            backend = self.backends[backend]()
+        self.backend = backend
+
         self.namespaceDict = {}
         self.defaultNamespaceDict = {}
+        # reverse index of namespaceDict: namespace URI -> (first) prefix
+        self.reverseNamespaceDict = {}
+        self.defaultReverseNamespaceDict = {}
         self.brickG = Graph()
         self.brickShapeG = Graph()
 
         if useBrickSchema:
-            data = pkgutil.get_data(__name__, "ontologies/Brick.ttl").decode()
-            self.brickG.parse(source=io.StringIO(data), format="turtle")
-            self.__buildNamespaceDict(self.brickG)
-
             # Remove rdfs:domain and rdfs:range.  The modified
             # ontology will be used for pySHACL reasoning.
             # See DESIGN.md for more discussion.
+            def removeDomainRange(g):
+                g.remove((None, _RDFS_DOMAIN, None))
+                g.remove((None, _RDFS_RANGE, None))
 
-            self.brickG.update(
-                "DELETE { ?s rdfs:domain ?o .} WHERE { ?s rdfs:domain ?o . }",
-                initNs=self.namespaceDict,
-            )
-            self.brickG.update(
-                "DELETE { ?s rdfs:range ?o .} WHERE { ?s rdfs:range ?o . }",
-                initNs=self.namespaceDict,
-            )
+            self.brickG = self.__loadOntology("ontologies/Brick.ttl", removeDomainRange)
+            self.__buildNamespaceDict(self.brickG)
 
         if useDefaultShapes:
-            data = pkgutil.get_data(__name__, "ontologies/BrickShape.ttl").decode()
-            self.brickShapeG.parse(source=io.StringIO(data), format="turtle")
+            self.brickShapeG = self.__loadOntology("ontologies/BrickShape.ttl")
             self.__buildNamespaceDict(self.brickShapeG)
 
         # preserve namespaces used in Brick.ttl and BrickShape.ttl
         self.defaultNamespaceDict = self.namespaceDict.copy()
+        self.defaultReverseNamespaceDict = self.reverseNamespaceDict.copy()
 
         self.log.debug("Validate __init__ done")
 
+    # Load a packaged ontology file, shared with other Validators if it was
+    # loaded before.  prepare(g) is applied once to a newly loaded graph.
+    def __loadOntology(self, resource, prepare=None):
+        data = pkgutil.get_data(__name__, resource)
+        key = (resource, hashlib.sha256(data).hexdigest())
+        g = self._ontologyCache.get(key)
+        if g is None:
+            g = _load_cached_graph(resource)
+            if prepare:
+                prepare(g)
+            self._ontologyCache[key] = g
+        return g
+
     class Result:
         """
         The type of returned object by validate() method
@@ -80,7 +330,7 @@ class Validator:
         inference="rdfs",
         abort_on_error=False,
         advanced=True,
-        meta_shacl=True,
+        meta_shacl=False,
         debug=False,
     ):
         """
@@ -89,31 +339,40 @@ class Validator:
         Args:
             shacl_graphs: extra shape graphs in additon to BrickShape.ttl
             ont_graphs: extra ontology graphs in addtion to Brick.ttl
+            meta_shacl: validate the shape graphs against shacl-shacl first.
+                Done once per distinct set of shape triples, blank node
+                labels included: shape graphs reused across calls are
+                checked once, but reparsing a file with blank nodes makes
+                new labels and the shapes are checked again.
 
         Returns:
             object of Result class (conforms, violationGraphs, textOutput)
         """
 
-        self.log.info("wrapper function for pySHACL validate()")
+        self.log.info("wrapper function for SHACL validate()")
 
         # combine shape graphs and combine ontology graphs
-        sg = Graph() + self.brickShapeG
-        for g in shacl_graphs:
-            sg = sg + g
-
-        og = Graph() + self.brickG
-        for g in ont_graphs:
-            og = og + g
+        sg = _merge_graphs([self.brickShapeG] + list(shacl_graphs))
+        og = _merge_graphs([self.brickG] + list(ont_graphs))
 
         self.data_graph = data_graph
 
+        # Only a backend that really runs the shacl-shacl check may skip it
+        # for shapes checked before, or record the shapes as checked.
+        shapesHash = None
+        if meta_shacl and getattr(self.backend, "supports_meta_shacl", False):
+            shapesHash = hash(frozenset(sg))
+            meta_shacl = shapesHash not in self._metaValidatedShapes
+
         # copy default namespace pool into working pool (a shallow copy will do)
         self.namespaceDict = self.defaultNamespaceDict.copy()
-        self.__buildNamespaceDict(data_graph)
-        self.__buildNamespaceDict(og)
-        self.__buildNamespaceDict(sg)
+        self.reverseNamespaceDict = self.defaultReverseNamespaceDict.copy()
+        # Brick.ttl and BrickShape.ttl are in the default pool already, so
+        # only scan the graphs passed in rather than the merged og and sg
+        for g in [data_graph] + list(ont_graphs) + list(shacl_graphs):
+            self.__buildNamespaceDict(g)
 
-        (self.conforms, self.results_graph, self.results_text) = pyshacl.validate(
+        (self.conforms, self.results_graph, self.results_text) = self.backend.validate(
             data_graph,
             shacl_graph=sg,
             ont_graph=og,
@@ -122,6 +381,9 @@ class Validator:
             meta_shacl=meta_shacl,
             debug=debug,
         )
+        if meta_shacl and shapesHash is not None:
+            # the backend raises an error if the shapes are invalid
+            self._metaValidatedShapes.add(shapesHash)
 
         if self.conforms:
             return self.Result(self.conforms, [], self.results_text)
@@ -133,7 +395,7 @@ class Validator:
             self.conforms, self.violationList, self.results_text + self.extraOutput
         )
 
-    # Post process after calling pySHACL.validate to find offending
+    # Post process after calling the backend's validate to find offending
     # triple(s) for each violation.
     def __attachOffendingTriples(self):
         self.log.info("find offending triple(s) for each violation")
@@ -149,23 +411,27 @@ class Validator:
 
         self.violationDict = {}
 
-        # Find triples (bn ?p ?obj) and put them into violationDict[k].
+        # Find triples (bn ?p ?obj) and put them into violation graph g.
         # Continue to follow obj if it's a BNode again.
-        def followBNode(k, bn):
-            for (s, p, obj) in self.results_graph:
-                if s == bn:
-                    self.violationDict[k].add((s, p, obj))
-                    if isinstance(obj, BNode):
-                        followBNode(k, obj)
-
-        for (s, p, obj) in self.results_graph:
-            if p == SH.result:  # SH.result's obj must be a BNode
-                # New graph for the violation and bind namespaces
-                self.violationDict[obj] = Graph()
-                for n in self.namespaceDict:
-                    self.violationDict[obj].bind(n, self.namespaceDict[n])
-                # Follow the BNode
-                followBNode(obj, obj)
+        def followBNode(g, bn):
+            triples = list(self.results_graph.triples((bn, None, None)))
+            g.addN((s, p, obj, g) for (s, p, obj) in triples)
+            for (s, p, obj) in triples:
+                if isinstance(obj, BNode):
+                    followBNode(g, obj)
+
+        # The violation roots are the objects of sh:result (BNodes), looked
+        # up through the store's predicate index.  Each root's triples are
+        # then reached through the subject index only.
+        namespaces = list(self.namespaceDict.items())
+        for (_, k) in self.results_graph.subject_objects(_SH_RESULT):
+            if k in self.violationDict:
+                continue
+            violation = Graph()
+            for (prefix, namespace) in namespaces:
+                violation.bind(prefix, namespace)
+            followBNode(violation, k)
+            self.violationDict[k] = violation
 
         # find the offending triple(s) for each violation graph and add into it
         for k, violation in self.violationDict.items():
@@ -185,44 +451,35 @@ class Validator:
 
             if prefix not in self.namespaceDict:
                 self.namespaceDict[prefix] = Namespace(path)
+                self.reverseNamespaceDict.setdefault(str(path), prefix)
 
-    # Query data graph and return the list of resulting triples
+    # Match a triple pattern against the data graph and return the list of
+    # resulting triples.  Terms are URIRefs or None (wildcard).
     def __queryDataGraph(self, s, p, o):
-        q = prepareQuery(
-            "SELECT ?s ?p ?o WHERE {%s %s %s .}"
-            % (s if s else "?s", p if p else "?p", o if o else "?o"),
-            initNs=self.namespaceDict,
-        )
-        res = self.data_graph.query(q)
+        res = list(self.data_graph.triples((s, p, o)))
         assert len(res), f"Must have at lease one triple like '{s} {p} {o}'"
         return res
 
-    # Take one contraint violation (a graph) and a sh: predicate,
+    # Take one contraint violation (a graph) and a sh: predicate (URIRef),
     # find the object which is a node in the data graph.
-    # Return the object found or None.
+    # Return the first object found or None.
     def __violationPredicateObj(self, violation, predicate, mustFind=True):
-        q = prepareQuery(
-            f"SELECT ?s ?p ?o WHERE {{ ?s {predicate} ?o . }}",
-            initNs=self.namespaceDict,
-        )
-        res = violation.query(q)
+        # Graph.value() needs a subject or object, so take the first match
+        obj = next(violation.objects(None, predicate), None)
         if mustFind:
-            assert len(res) == 1, f"Must have predicate '{predicate}'"
-        if len(res):
-            for (s, p, o) in res:
-                return o
-        return None  # Ok to miss certain predicate, such as sh:resultPath
+            assert obj is not None, f"Must have predicate '{predicate}'"
+        return obj  # Ok to miss certain predicate, such as sh:resultPath
 
     # Take one contraint violation (a graph) and find the potential offending
     # triples.  Return the triples in a list.
     def __triplesForOneViolation(self, violation):
         resultPath = self.__violationPredicateObj(
-            violation, "sh:resultPath", mustFind=False
+            violation, _SH_RESULT_PATH, mustFind=False
         )
         if resultPath:
-            focusNode = self.__violationPredicateObj(violation, "sh:focusNode")
+            focusNode = self.__violationPredicateObj(violation, _SH_FOCUS_NODE)
             valueNode = self.__violationPredicateObj(
-                violation, "sh:value", mustFind=False
+                violation, _SH_VALUE, mustFind=False
             )
 
             # TODO: Although we haven't seen a violation with sh:resultPath where
@@ -233,48 +490,46 @@ class Validator:
             if valueNode:
                 g = Graph()
                 g.add((focusNode, resultPath, valueNode))
-                violation.add((BNode(), BSH["offendingTriple"], g))
+                violation.add((BNode(), _OFFENDING_TRIPLE, g))
                 return
             else:
                 # Without valueNode, we look for constraint, such as
                 # sh:class <class> and sh:minCount <number>
                 cComp = self.__violationPredicateObj(
-                    violation, "sh:sourceConstraintComponent"
+                    violation, _SH_SOURCE_CONSTRAINT_COMPONENT
                 )
-                c = cComp.split("#")[1].replace("ConstraintComponent", "")
-                cPred = "sh:" + c[0].lower() + c[1:]
-                cObj = f"<{self.__violationPredicateObj(violation, cPred)}>"
+                (sh, c) = split_uri(cComp)
+                c = c.replace("ConstraintComponent", "")
+                cName = c[0].lower() + c[1:]
+                cObj = f"<{self.__violationPredicateObj(violation, SH[cName])}>"
 
                 g = Graph()
-                g.add((focusNode, resultPath, Literal(f"{cPred} {cObj}")))
-                violation.add((BNode(), BSH["offenderHint"], g))
+                g.add((focusNode, resultPath, Literal(f"sh:{cName} {cObj}")))
+                violation.add((BNode(), _OFFENDER_HINT, g))
 
             return
         # end of if resultPath:
 
         # Without sh:resultPath or sh:value in the violation. We are currently only
         # concerned with the RDFS.domain shape.
-        sourceShape = self.__violationPredicateObj(violation, "sh:sourceShape")
+        sourceShape = self.__violationPredicateObj(violation, _SH_SOURCE_SHAPE)
         if sourceShape.endswith("DomainShape"):
-            (bsh, shapeName) = sourceShape.split("#")
+            (bsh, shapeName) = split_uri(sourceShape)
 
             # For a brick property xyz with RDFS.domain predicate, the shape's name
             # is bsh:xyzDomainShape.  Here we tease out brick:xyz to make the query.
             brickProp = shapeName[: -len("DomainShape")]
-            path = "brick:" + brickProp
-            fullPath = self.namespaceDict["brick"] + brickProp
+            fullPath = BRICK[brickProp]
 
-            # The full name (http...) of the focusNode doesn't seem to work
-            # in the query.  Therefore make a prefixed version for the query.
-            focusNode = self.__violationPredicateObj(violation, "sh:focusNode")
-            res = self.__queryDataGraph(f"<{focusNode}>", path, None)
+            focusNode = self.__violationPredicateObj(violation, _SH_FOCUS_NODE)
+            res = self.__queryDataGraph(focusNode, fullPath, None)
 
             # Due to inherent ambiguity of this kind of shape,
             # multiple triples may be found.
             for (s, p, o) in res:
                 g = Graph()
-                g.add((focusNode, URIRef(fullPath), o))
-                violation.add((BNode(), BSH["offendingTriple"], g))
+                g.add((focusNode, fullPath, o))
+                violation.add((BNode(), _OFFENDING_TRIPLE, g))
             return
         # end of if sourceShape.endswith('DomainShape'):
 
@@ -307,33 +562,48 @@ class Validator:
                 self.extraOutput += line
                 self.extraOutput += "\n"
 
+    # Format a node as prefix:name if its namespace is known, else as N3
+    def __qname(self, node):
+        if isinstance(node, URIRef):
+            try:
+                (ns, name) = split_uri(node)
+            except ValueError:
+                return node.n3()
+            prefix = self.reverseNamespaceDict.get(ns)
+            return f"{prefix}:{name}" if prefix is not None else node.n3()
+        if isinstance(node, Literal) and node.datatype is not None:
+            return f"{Literal(str(node)).n3()}^^{self.__qname(node.datatype)}"
+        return node.n3()
+
+    # Append a single triple to output.  Offending triples are too small
+    # to be worth a pass through the Turtle serializer.
+    def __appendTriple(self, s, p, o):
+        self.extraOutput += f"{self.__qname(s)} {self.__qname(p)} {self.__qname(o)} .\n"
+
     def __appendViolation(self, msg, g):
         # first print the violation body
         self.__appendGraph(msg, g)
 
         # tease out the triples with offendingTriple as predicate
-        tripleGraphs = []
+        triples = []
         tripleType = None
         for (s, p, o) in g:
-            if p == BSH["offendingTriple"] or p == BSH["offenderHint"]:
+            if p == _OFFENDING_TRIPLE or p == _OFFENDER_HINT:
                 tripleType = p
-                tripleG = Graph()
-                for (s1, p1, o1) in o:
-                    tripleG.add((s1, p1, o1))
-                tripleGraphs.append(tripleG)
+                triples.extend(o)
 
-        if len(tripleGraphs) == 0:
+        if len(triples) == 0:
             self.extraOutput += "Please let us know if the contraint violation information is insufficient.\n"
             return
 
-        if tripleType == BSH["offenderHint"]:
+        if tripleType == _OFFENDER_HINT:
             self.extraOutput += "Violation hint (subject predicate cause):\n"
-        elif len(tripleGraphs) == 1:
+        elif len(triples) == 1:
             self.extraOutput += "Offending triple:\n"
         else:
             self.extraOutput += "Potential offending triples:\n"
-        for tripleG in tripleGraphs:
-            self.__appendGraph(None, tripleG)
+        for (s, p, o) in triples:
+            self.__appendTriple(s, p, o)
 
     def __getExtraOutput(self):
         self.extraOutput = f"\nAdditional info ({len(self.violationList)} constraint violations with offender hint):\n"
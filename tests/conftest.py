@@ -1,3 +1,4 @@
+import os
 import pytest
 
 # using code from https://docs.pytest.org/en/latest/example/simple.html
@@ -21,3 +22,9 @@ def pytest_collection_modifyitems(config, items):
     for item in items:
         if "slow" in item.keywords:
             item.add_marker(skip_slow)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def brick_cache_dir(tmp_path_factory):
+    # keep the parsed ontology cache of brickschema.validate out of ~/.cache
+    os.environ["BRICK_CACHE_DIR"] = str(tmp_path_factory.mktemp("brick_cache"))
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Stand-in for TopQuadrant's shaclvalidate.sh used by test_validate.py:
+takes the same -datafile/-shapesfile arguments and prints the validation
+report as Turtle, computed with pySHACL.
+"""
+import argparse
+import sys
+import pyshacl
+from rdflib import Graph
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-datafile", required=True)
+parser.add_argument("-shapesfile", required=True)
+args = parser.parse_args()
+
+dataG = Graph().parse(args.datafile, format="nt")
+shapeG = Graph().parse(args.shapesfile, format="nt")
+# the data graph arrives already expanded, like for the real tool
+(conforms, report, text) = pyshacl.validate(dataG, shacl_graph=shapeG, inference="none")
+out = report.serialize(format="turtle")
+sys.stdout.write(out.decode() if isinstance(out, bytes) else out)
@@ -1,9 +1,11 @@
-from brickschema.validate import Validator
+from brickschema.validate import Validator, PySHACLBackend, TopBraidBackend, _load_cached_graph
 from rdflib import Graph
+from rdflib.compare import isomorphic
 import pytest
 import os, sys
 import io
 import pkgutil
+import pickle
 
 def loadGraph(resource):
     data = pkgutil.get_data(__name__, resource).decode()
@@ -82,3 +84,139 @@ def test_useExtraOntGraphShapeGraph():
                         shacl_graphs=[shapeG1, shapeG2])
     assert not result.conforms, 'expect constraint violations in badBuilding.ttl'
     assert len(result.violationGraphs) == 12, 'unexpected # of violations'
+
+
+def test_backend():
+    with pytest.raises(Exception):
+        Validator(backend='unknown')
+    with pytest.raises(FileNotFoundError):
+        Validator(backend=TopBraidBackend(command='no-such-shaclvalidate.sh'))
+
+
+def stubCommand(tmp_path):
+    # run the stub with this interpreter, not whatever python3 is on PATH
+    stub = os.path.join(os.path.dirname(__file__), 'shaclvalidate_stub.py')
+    command = tmp_path / 'shaclvalidate.sh'
+    command.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{stub}" "$@"\n')
+    command.chmod(0o755)
+    return str(command)
+
+
+def test_topBraidBackend(tmp_path):
+    v = Validator(backend=TopBraidBackend(command=stubCommand(tmp_path)))
+
+    result = v.validate(loadGraph('data/badBuilding.ttl'))
+    assert not result.conforms, 'expect constraint violations in badBuilding.ttl'
+    assert len(result.violationGraphs) == 5, 'unexpected # of violations'
+
+    result = v.validate(loadGraph('data/goodBuilding.ttl'))
+    assert result.conforms, 'expect no constraint violations in goodBuilding.ttl'
+    assert len(result.violationGraphs) == 0, 'unexpected # of violations'
+
+
+def test_topBraidBackendLiterals(tmp_path):
+    # 1, 1.0 and true are equal in Python; inference must not mix them up
+    dataG = Graph().parse(data="""
+        @prefix ex: <http://example.com/> .
+        ex:a ex:size 1 .
+        ex:b ex:flag true .
+        ex:c ex:weight 1.0 .
+    """, format='turtle')
+    shapeG = Graph().parse(data="""
+        @prefix ex: <http://example.com/> .
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+        ex:SizeShape a sh:NodeShape ;
+            sh:targetSubjectsOf ex:size ;
+            sh:property [ sh:path ex:size ;
+                          sh:datatype xsd:integer ;
+                          sh:maxCount 1 ] .
+    """, format='turtle')
+
+    backends = [PySHACLBackend(), TopBraidBackend(command=stubCommand(tmp_path))]
+    for inference in ['rdfs', 'owlrl', 'both']:
+        results = []
+        for backend in backends:
+            v = Validator(useBrickSchema=False, useDefaultShapes=False,
+                          backend=backend)
+            result = v.validate(dataG, shacl_graphs=[shapeG],
+                                inference=inference)
+            results.append((result.conforms, len(result.violationGraphs)))
+        assert results[0] == results[1], f'backends differ for {inference}'
+        assert results[0] == (True, 0), f'unexpected result for {inference}'
+
+
+def test_offendingTripleOutput():
+    dataG = Graph()
+    dataG.parse(data="""
+        @prefix bldg: <http://example.com/mybuilding#> .
+        bldg:thing <http://unbound.example.com/size> 5 .
+    """, format='turtle')
+    shapeG = Graph()
+    shapeG.parse(data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+        [] a sh:NodeShape ;
+            sh:targetSubjectsOf <http://unbound.example.com/size> ;
+            sh:property [ sh:path <http://unbound.example.com/size> ;
+                          sh:datatype xsd:string ] .
+    """, format='turtle')
+    v = Validator(useBrickSchema=False, useDefaultShapes=False)
+    result = v.validate(dataG, shacl_graphs=[shapeG])
+    assert not result.conforms, 'expect a datatype violation'
+    # known namespace as prefix:name, unknown one as <uri>, typed literal
+    # with its datatype spelled out
+    assert ('Offending triple:\n'
+            'bldg:thing <http://unbound.example.com/size> "5"^^xsd:integer .\n'
+            ) in result.textOutput
+
+
+class MetaShaclRecorder(PySHACLBackend):
+    def __init__(self, supports_meta_shacl):
+        self.supports_meta_shacl = supports_meta_shacl
+        self.calls = []
+
+    def validate(self, *args, **kwargs):
+        self.calls.append(kwargs['meta_shacl'])
+        return super().validate(*args, **kwargs)
+
+
+def test_metaShaclOnce():
+    dataG = loadGraph('data/badBuilding.ttl')
+    shapeG = loadGraph('data/extraShapes.ttl')
+
+    # a backend without the shacl-shacl check must not mark shapes checked
+    ignoring = MetaShaclRecorder(supports_meta_shacl=False)
+    v = Validator(useDefaultShapes=False, backend=ignoring)
+    v.validate(dataG, shacl_graphs=[shapeG], meta_shacl=True)
+    v.validate(dataG, shacl_graphs=[shapeG], meta_shacl=True)
+    assert ignoring.calls == [True, True]
+
+    checking = MetaShaclRecorder(supports_meta_shacl=True)
+    v = Validator(useDefaultShapes=False, backend=checking)
+    v.validate(dataG, shacl_graphs=[shapeG], meta_shacl=True)
+    v.validate(dataG, shacl_graphs=[shapeG], meta_shacl=True)
+    assert checking.calls == [True, False], 'expect shapes meta-validated once'
+
+
+def test_sharedOntologyGraph():
+    v1 = Validator()
+    v2 = Validator()
+    assert v1.brickG is v2.brickG, 'expect Brick.ttl to be loaded once'
+    assert v1.brickShapeG is v2.brickShapeG, 'expect BrickShape.ttl to be loaded once'
+
+
+def test_cachedOntologyGraph(tmp_path):
+    g1 = _load_cached_graph('ontologies/BrickShape.ttl', cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1, 'expect parsed graph to be cached'
+    g2 = _load_cached_graph('ontologies/BrickShape.ttl', cache_dir=str(tmp_path))
+    assert set(g1) == set(g2), 'cached graph differs from parsed graph'
+    assert dict(g1.namespaces()) == dict(g2.namespaces())
+
+
+def test_damagedOntologyCache(tmp_path):
+    g1 = _load_cached_graph('ontologies/BrickShape.ttl', cache_dir=str(tmp_path))
+    for cached in tmp_path.iterdir():
+        cached.write_bytes(pickle.dumps('not a (namespaces, triples) tuple'))
+    g2 = _load_cached_graph('ontologies/BrickShape.ttl', cache_dir=str(tmp_path))
+    assert isomorphic(g1, g2), 'expect damaged cache to be ignored'